@@ -6,26 +6,162 @@ import sqlite3
 
 from validators import fields_validator
 
+DATABASE_PATH = "inventory.db"
 
-def get_database_connection():
+# Bumped whenever migrate_database() learns a new change
+SCHEMA_VERSION = 1
+
+# Columns returned by the product queries, version is only read for updates
+PRODUCT_COLUMNS = "p.id, p.name, p.description, p.stock, p.price, c.name"
+PRODUCT_TABLES = "products AS p LEFT JOIN categories AS c ON c.id = p.category_id"
+UPDATABLE_COLUMNS = ("name", "description", "stock", "price", "category")
+
+# update_product_in_db() results
+UPDATE_SUCCESS = "updated"
+UPDATE_CONFLICT = "conflict"
+UPDATE_NOT_FOUND = "not_found"
+UPDATE_NO_CHANGES = "unchanged"
+
+
+def get_database_connection(db_path=DATABASE_PATH):
     """Get a database connection"""
-    connection = sqlite3.connect("inventory.db")
+    connection = sqlite3.connect(db_path)
     cursor = connection.cursor()
 
+    # The schema version is kept in user_version so migrations run only once
+    cursor.execute("PRAGMA user_version")
+    if cursor.fetchone()[0] < SCHEMA_VERSION:
+        migrate_database(cursor)
+
+    return connection, cursor
+
+
+def create_products_table(cursor, table_name="products"):
+    """Create the products table with the current schema"""
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS products (
+        f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
             description TEXT,
             stock INTEGER NOT NULL,
             price REAL NOT NULL,
-            category TEXT
+            category_id INTEGER REFERENCES categories(id),
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at TEXT
         )
         """
     )
 
-    return connection, cursor
+
+def migrate_database(cursor):
+    """Create the tables or bring an older database up to SCHEMA_VERSION
+
+    Runs in a single write transaction, so two connections opening an old
+    database at the same time do not both migrate it.
+    """
+    connection = cursor.connection
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < SCHEMA_VERSION:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS categories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+                )
+                """
+            )
+            create_products_table(cursor)
+            migrate_products_table(cursor)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_products_category_id "
+                "ON products(category_id)"
+            )
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+
+
+def migrate_products_table(cursor):
+    """Add the columns missing in databases created by older versions"""
+    cursor.execute("PRAGMA table_info(products)")
+    existing_columns = {column[1] for column in cursor.fetchall()}
+
+    if "version" not in existing_columns:
+        cursor.execute(
+            "ALTER TABLE products ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+        )
+    if "updated_at" not in existing_columns:
+        cursor.execute("ALTER TABLE products ADD COLUMN updated_at TEXT")
+    if "category_id" not in existing_columns:
+        cursor.execute(
+            "ALTER TABLE products ADD COLUMN category_id INTEGER REFERENCES categories(id)"
+        )
+
+    # Move the old free text categories to the categories table
+    if "category" in existing_columns:
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO categories (name)
+            SELECT DISTINCT category FROM products WHERE category IS NOT NULL
+            """
+        )
+        cursor.execute(
+            """
+            UPDATE products
+            SET category_id = (
+                SELECT id FROM categories WHERE name = products.category
+            )
+            WHERE category IS NOT NULL
+            """
+        )
+        drop_products_category_column(cursor)
+
+
+def drop_products_category_column(cursor):
+    """Remove the old category text column from products
+
+    DROP COLUMN needs SQLite 3.35, older versions get the table rebuilt
+    without the column and renamed back.
+    """
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        cursor.execute("ALTER TABLE products DROP COLUMN category")
+        return
+
+    # Keep the AUTOINCREMENT counter so deleted ids are not reused
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'products'")
+    sequence = cursor.fetchone()
+
+    create_products_table(cursor, "products_migration")
+    cursor.execute(
+        """
+        INSERT INTO products_migration
+            (id, name, description, stock, price, category_id, version, updated_at)
+        SELECT id, name, description, stock, price, category_id, version, updated_at
+        FROM products
+        """
+    )
+    cursor.execute("DROP TABLE products")
+    cursor.execute("ALTER TABLE products_migration RENAME TO products")
+
+    if sequence:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'products'", sequence
+        )
+
+
+def get_category_id(cursor, category):
+    """Get the id of a category, adding it to the categories table if new"""
+    if category is None:
+        return None
+
+    cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
+    cursor.execute("SELECT id FROM categories WHERE name = ?", (category,))
+    return cursor.fetchone()[0]
 
 
 def get_valid_input(prompt, field_type):
@@ -81,10 +217,10 @@ def add_product():
     """ Add a new product to the database if the input is valid """
     cursor.execute(
         """
-        INSERT INTO products (name, description, stock, price, category)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO products (name, description, stock, price, category_id, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         """,
-        (name, description, stock, price, category),
+        (name, description, stock, price, get_category_id(cursor, category)),
     )
 
     """ Commit the changes to the database and close the connection """
@@ -98,58 +234,178 @@ def get_all_products():
     """Get all products from the database"""
     connection, cursor = get_database_connection()
 
-    cursor.execute("SELECT * FROM products ORDER BY id")
+    cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} ORDER BY p.id")
     products = cursor.fetchall()
     connection.close()
     return products
 
 
+def iter_all_products(batch_size=1000, db_path=DATABASE_PATH):
+    """Yield all products ordered by id, fetching them in batches
+
+    The connection stays open until the generator is exhausted or closed.
+    """
+    connection, cursor = get_database_connection(db_path)
+    try:
+        cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} ORDER BY p.id")
+        while True:
+            products = cursor.fetchmany(batch_size)
+            if not products:
+                break
+            yield from products
+    finally:
+        connection.close()
+
+
 def search_product_by_id(product_id):
     """Search for a product by ID"""
     connection, cursor = get_database_connection()
 
-    cursor.execute("SELECT * FROM products WHERE id = ?", (product_id,))
+    cursor.execute(
+        f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE p.id = ?",
+        (product_id,),
+    )
     product = cursor.fetchone()
     connection.close()
     return product
 
 
+def search_product_with_version(product_id, db_path=DATABASE_PATH):
+    """Search for a product by ID along with its current row version
+
+    Returns:
+        tuple: (product, version) or (None, None) if not found
+    """
+    connection, cursor = get_database_connection(db_path)
+
+    cursor.execute(
+        f"SELECT {PRODUCT_COLUMNS}, p.version FROM {PRODUCT_TABLES} WHERE p.id = ?",
+        (product_id,),
+    )
+    row = cursor.fetchone()
+    connection.close()
+
+    if not row:
+        return None, None
+    return row[:-1], row[-1]
+
+
 def search_products_by_name(name):
     """Search for products by name (partial match)"""
     connection, cursor = get_database_connection()
 
-    cursor.execute("SELECT * FROM products WHERE name LIKE ?", (f"%{name}%",))
+    cursor.execute(
+        f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE p.name LIKE ?",
+        (f"%{name}%",),
+    )
     products = cursor.fetchall()
     connection.close()
     return products
 
 
-def search_products_by_category(category):
-    """Search for products by category"""
-    connection, cursor = get_database_connection()
+def search_products_by_category(category, exact=False, db_path=DATABASE_PATH):
+    """Search for products by category name (exact or prefix match)
+
+    Categories are looked up by name on the categories table, both lookups
+    use its index and then products are found through idx_products_category_id.
+    """
+    connection, cursor = get_database_connection(db_path)
 
-    cursor.execute("SELECT * FROM products WHERE category LIKE ?", (f"%{category}%",))
+    if exact:
+        condition = "c.name = ?"
+        param = category
+    else:
+        # Escape LIKE wildcards so the input is only used as a prefix
+        escaped = category.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        condition = "c.name LIKE ? ESCAPE '\\'"
+        param = f"{escaped}%"
+
+    cursor.execute(
+        f"""
+        SELECT {PRODUCT_COLUMNS}
+        FROM categories AS c
+        JOIN products AS p ON p.category_id = c.id
+        WHERE {condition}
+        ORDER BY p.id
+        """,
+        (param,),
+    )
     products = cursor.fetchall()
     connection.close()
     return products
 
 
-def update_product_in_db(product_id, name, description, stock, price, category):
-    """Update an existing product in the database"""
-    connection, cursor = get_database_connection()
+def update_product_in_db(product_id, changes, expected_version, db_path=DATABASE_PATH):
+    """Update the changed fields of a product if nobody else modified it
+
+    Only the columns in changes are written, and the row is only updated
+    while its version still matches the one read before editing.
+
+    Args:
+        product_id: id of the product to update
+        changes: dict column -> new value, keys from UPDATABLE_COLUMNS
+        expected_version: version read together with the product
+        db_path: database file to update
+
+    Returns:
+        str: UPDATE_SUCCESS, UPDATE_CONFLICT, UPDATE_NOT_FOUND or UPDATE_NO_CHANGES
+    """
+    invalid_columns = set(changes) - set(UPDATABLE_COLUMNS)
+    if invalid_columns:
+        raise ValueError(f"Invalid product columns: {sorted(invalid_columns)}")
+
+    if not changes:
+        return UPDATE_NO_CHANGES
+
+    columns = [column for column in UPDATABLE_COLUMNS if column in changes]
+    params = [changes[column] for column in columns]
+
+    connection, cursor = get_database_connection(db_path)
+
+    # Category names are stored as a reference to the categories table
+    if "category" in changes:
+        category_index = columns.index("category")
+        columns[category_index] = "category_id"
+        params[category_index] = get_category_id(cursor, changes["category"])
+
+    set_clause = ", ".join(f"{column} = ?" for column in columns)
 
     cursor.execute(
-        """
-        UPDATE products 
-        SET name = ?, description = ?, stock = ?, price = ?, category = ?
-        WHERE id = ?
+        f"""
+        UPDATE products
+        SET {set_clause}, version = version + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND version = ?
         """,
-        (name, description, stock, price, category, product_id),
+        (*params, product_id, expected_version),
     )
-    connection.commit()
-    rows_affected = cursor.rowcount
+
+    if cursor.rowcount > 0:
+        connection.commit()
+        connection.close()
+        return UPDATE_SUCCESS
+
+    # Nothing updated, drop a category added for this update and find out
+    # if the product changed or was deleted
+    connection.rollback()
+    cursor.execute("SELECT 1 FROM products WHERE id = ?", (product_id,))
+    exists = cursor.fetchone() is not None
     connection.close()
-    return rows_affected > 0
+    return UPDATE_CONFLICT if exists else UPDATE_NOT_FOUND
+
+
+def get_product_changes(current_product, name, description, stock, price, category):
+    """Get a dict with only the fields that differ from the current product"""
+    new_values = dict(
+        zip(UPDATABLE_COLUMNS, (name, description, stock, price, category))
+    )
+    current_values = dict(zip(UPDATABLE_COLUMNS, current_product[1:]))
+
+    # Inputs come as text, compare as text so "22" matches a stored 22
+    return {
+        column: value
+        for column, value in new_values.items()
+        if str(value) != str(current_values[column])
+    }
 
 
 def update_product():
@@ -159,8 +415,8 @@ def update_product():
     # Get product ID
     product_id = get_valid_input("Enter the product ID to update: ", "id")
 
-    # Get current product data
-    current_product = search_product_by_id(product_id)
+    # Get current product data and the version it was read at
+    current_product, current_version = search_product_with_version(product_id)
 
     if not current_product:
         print("❌ Product not found.")
@@ -193,15 +449,21 @@ def update_product():
         f"Category [{current_category}]: ", "category", current_category
     )
 
-    # Update in database
-    success = update_product_in_db(
-        product_id, name, description, stock, price, category
+    # Update only the changed fields in database
+    changes = get_product_changes(
+        current_product, name, description, stock, price, category
     )
+    result = update_product_in_db(product_id, changes, current_version)
 
-    if success:
+    if result == UPDATE_SUCCESS:
         print("✅ Product updated successfully!")
+    elif result == UPDATE_NO_CHANGES:
+        print("ℹ️ No changes to update.")
+    elif result == UPDATE_CONFLICT:
+        print("❌ The product was modified by someone else while you were editing.")
+        print("Your changes were not saved, please try again.")
     else:
-        print("❌ Error updating product.")
+        print("❌ Product not found, it may have been deleted.")
 
 
 def delete_product_from_db(product_id):
@@ -223,7 +485,24 @@ def delete_product_from_db(product_id):
         return None, False
 
 
-def get_complete_report():
+def get_category_counts(cursor):
+    """Get (category, count) tuples, counted on idx_products_category_id"""
+    cursor.execute(
+        """
+        SELECT c.name, counts.total
+        FROM (
+            SELECT category_id, COUNT(*) AS total
+            FROM products
+            GROUP BY category_id
+        ) AS counts
+        LEFT JOIN categories AS c ON c.id = counts.category_id
+        ORDER BY c.name
+        """
+    )
+    return cursor.fetchall()
+
+
+def get_complete_report(db_path=DATABASE_PATH):
     """Get all report data in a single database connection for efficiency
 
     Returns:
@@ -234,7 +513,7 @@ def get_complete_report():
             'categories': list of tuples (category, count)
         }
     """
-    connection, cursor = get_database_connection()
+    connection, cursor = get_database_connection(db_path)
 
     # Total products
     cursor.execute("SELECT COUNT(*) FROM products")
@@ -251,8 +530,7 @@ def get_complete_report():
     low_stock_count = cursor.fetchone()[0]
 
     # Products by category
-    cursor.execute("SELECT category, COUNT(*) FROM products GROUP BY category")
-    categories = cursor.fetchall()
+    categories = get_category_counts(cursor)
 
     connection.close()
 
@@ -281,23 +559,23 @@ def get_products_by_numeric_filter(field, condition, value, value2=None):
     # Prepare field for SQL query
     if field == "price":
         # Remove $ and spaces from price for numeric comparison
-        sql_field = "CAST(REPLACE(REPLACE(price, '$', ''), ' ', '') AS REAL)"
+        sql_field = "CAST(REPLACE(REPLACE(p.price, '$', ''), ' ', '') AS REAL)"
     else:
         # Stock is already numeric
-        sql_field = "CAST(stock AS INTEGER)"
+        sql_field = "CAST(p.stock AS INTEGER)"
 
     # Build query based on condition
     if condition == "<":
-        query = f"SELECT * FROM products WHERE {sql_field} < ? ORDER BY {sql_field}"
+        query = f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE {sql_field} < ? ORDER BY {sql_field}"
         params = (value,)
     elif condition == "=":
-        query = f"SELECT * FROM products WHERE {sql_field} = ? ORDER BY {sql_field}"
+        query = f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE {sql_field} = ? ORDER BY {sql_field}"
         params = (value,)
     elif condition == ">":
-        query = f"SELECT * FROM products WHERE {sql_field} > ? ORDER BY {sql_field}"
+        query = f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE {sql_field} > ? ORDER BY {sql_field}"
         params = (value,)
     elif condition == "between":
-        query = f"SELECT * FROM products WHERE {sql_field} BETWEEN ? AND ? ORDER BY {sql_field}"
+        query = f"SELECT {PRODUCT_COLUMNS} FROM {PRODUCT_TABLES} WHERE {sql_field} BETWEEN ? AND ? ORDER BY {sql_field}"
         params = (value, value2)
     else:
         connection.close()
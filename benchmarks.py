@@ -0,0 +1,408 @@
+"""
+Benchmarks - Timing of the inventory operations on generated databases
+Usage: python benchmarks.py [benchmark] [--rows N]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import threading
+import time
+
+from appFeatures import (
+    UPDATE_CONFLICT,
+    UPDATE_SUCCESS,
+    get_category_counts,
+    get_category_id,
+    get_database_connection,
+    iter_all_products,
+    search_product_with_version,
+    search_products_by_category,
+    update_product_in_db,
+)
+from databaseBackup import create_backup, restore_backup, verify_backup
+from marketDashboard import PRODUCT_TABLE_COLUMNS
+from reportAnalytics import get_extended_report, numpy_available
+from tableRenderer import render_table
+
+BENCHMARK_CATEGORIES = ["fruits", "Fruit", "dairy", "bakery", "drinks", "meat"]
+WRITER_THREADS = 8
+UPDATES_PER_WRITER = 200
+CONTENDED_PRODUCTS = 4
+
+
+def create_benchmark_database(db_path, rows, seed=42):
+    """Fill a new database with random products stored like the app does"""
+    generator = random.Random(seed)
+    connection, cursor = get_database_connection(db_path)
+    category_ids = [get_category_id(cursor, name) for name in BENCHMARK_CATEGORIES]
+    cursor.executemany(
+        """
+        INSERT INTO products (name, description, stock, price, category_id)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (
+            (
+                f"Product {i}",
+                f"Benchmark product number {i}",
+                generator.randint(0, 5000),
+                f"$ {generator.uniform(1, 10000):.2f}",
+                generator.choice(category_ids),
+            )
+            for i in range(rows)
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+def timed(function, *args, repeat=3, **kwargs):
+    """Run a function several times and return the best time in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_analytics(db_path, rows):
+    """Compare the NumPy and pure Python extended report"""
+    print(f"\n=== Extended report ({rows} rows) ===")
+
+    python_time = timed(get_extended_report, db_path, use_numpy=False)
+    print(f"Pure Python: {python_time:.3f}s")
+
+    if numpy_available():
+        numpy_time = timed(get_extended_report, db_path, use_numpy=True)
+        print(f"NumPy:       {numpy_time:.3f}s ({python_time / numpy_time:.1f}x)")
+    else:
+        print("NumPy:       not installed, skipped")
+
+
+def blind_stock_increment(db_path, product_id):
+    """Read-modify-write that overwrites the full row, like the old update"""
+    connection, cursor = get_database_connection(db_path)
+    cursor.execute(
+        """
+        SELECT name, description, stock, price, category_id
+        FROM products
+        WHERE id = ?
+        """,
+        (product_id,),
+    )
+    name, description, stock, price, category_id = cursor.fetchone()
+    connection.close()
+
+    connection, cursor = get_database_connection(db_path)
+    cursor.execute(
+        """
+        UPDATE products
+        SET name = ?, description = ?, stock = ?, price = ?, category_id = ?
+        WHERE id = ?
+        """,
+        (name, description, stock + 1, price, category_id, product_id),
+    )
+    connection.commit()
+    connection.close()
+    return 0
+
+
+def optimistic_stock_increment(db_path, product_id):
+    """Versioned partial update, retried until no other writer interferes"""
+    conflicts = 0
+    while True:
+        product, version = search_product_with_version(product_id, db_path)
+        result = update_product_in_db(
+            product_id, {"stock": product[3] + 1}, version, db_path
+        )
+        if result == UPDATE_SUCCESS:
+            return conflicts
+        if result != UPDATE_CONFLICT:
+            raise RuntimeError(f"Unexpected update result: {result}")
+        conflicts += 1
+
+
+def run_concurrent_writers(db_path, increment):
+    """Run several writers incrementing the stock of a few shared products
+
+    Returns:
+        tuple: (elapsed seconds, lost updates, conflicts retried)
+    """
+    product_ids = range(1, CONTENDED_PRODUCTS + 1)
+    stock_query = "SELECT SUM(stock) FROM products WHERE id <= ?"
+
+    connection, cursor = get_database_connection(db_path)
+    cursor.execute(stock_query, (CONTENDED_PRODUCTS,))
+    initial_stock = cursor.fetchone()[0]
+    connection.close()
+
+    conflicts = []
+
+    def writer(offset):
+        writer_conflicts = 0
+        for i in range(UPDATES_PER_WRITER):
+            product_id = product_ids[(offset + i) % CONTENDED_PRODUCTS]
+            writer_conflicts += increment(db_path, product_id)
+        conflicts.append(writer_conflicts)
+
+    threads = [
+        threading.Thread(target=writer, args=(offset,))
+        for offset in range(WRITER_THREADS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    connection, cursor = get_database_connection(db_path)
+    cursor.execute(stock_query, (CONTENDED_PRODUCTS,))
+    final_stock = cursor.fetchone()[0]
+    connection.close()
+
+    expected_increment = WRITER_THREADS * UPDATES_PER_WRITER
+    lost_updates = expected_increment - (final_stock - initial_stock)
+    return elapsed, lost_updates, sum(conflicts)
+
+
+def benchmark_updates(db_path, rows):
+    """Compare full-row blind updates with versioned partial updates"""
+    total_updates = WRITER_THREADS * UPDATES_PER_WRITER
+    print(
+        f"\n=== Concurrent updates ({WRITER_THREADS} writers, "
+        f"{total_updates} updates on {CONTENDED_PRODUCTS} products) ==="
+    )
+
+    for label, increment in (
+        ("Blind full row", blind_stock_increment),
+        ("Optimistic    ", optimistic_stock_increment),
+    ):
+        elapsed, lost_updates, conflicts = run_concurrent_writers(db_path, increment)
+        print(
+            f"{label}: {total_updates / elapsed:.0f} updates/s, "
+            f"{lost_updates} lost updates, {conflicts} conflicts retried"
+        )
+
+
+def benchmark_categories(db_path, rows):
+    """Compare the categories table against the old free text column"""
+    print(f"\n=== Category lookups ({rows} rows) ===")
+
+    # Copy of the products with the category as text, like before migrating
+    connection, cursor = get_database_connection(db_path)
+    cursor.execute("DROP TABLE IF EXISTS legacy_products")
+    cursor.execute(
+        """
+        CREATE TABLE legacy_products AS
+        SELECT p.id, p.name, p.description, p.stock, p.price, c.name AS category
+        FROM products AS p
+        LEFT JOIN categories AS c ON c.id = p.category_id
+        """
+    )
+    connection.commit()
+
+    def legacy_search(category):
+        cursor.execute(
+            "SELECT * FROM legacy_products WHERE category LIKE ?", (f"%{category}%",)
+        )
+        return cursor.fetchall()
+
+    def legacy_counts():
+        cursor.execute(
+            "SELECT category, COUNT(*) FROM legacy_products GROUP BY category"
+        )
+        return cursor.fetchall()
+
+    for label, legacy, normalized in (
+        (
+            "Search 'dairy'",
+            lambda: legacy_search("dairy"),
+            lambda: search_products_by_category("dairy", exact=True, db_path=db_path),
+        ),
+        (
+            "Search 'bak'  ",
+            lambda: legacy_search("bak"),
+            lambda: search_products_by_category("bak", db_path=db_path),
+        ),
+        ("GROUP BY      ", legacy_counts, lambda: get_category_counts(cursor)),
+    ):
+        legacy_time = timed(legacy)
+        normalized_time = timed(normalized)
+        print(
+            f"{label}: text column {legacy_time * 1000:.1f}ms, "
+            f"categories table {normalized_time * 1000:.1f}ms "
+            f"({legacy_time / normalized_time:.1f}x)"
+        )
+
+    cursor.execute("DROP TABLE legacy_products")
+    connection.commit()
+    connection.close()
+
+
+def measure_writer_latency(db_path, operation):
+    """Run an operation while a writer keeps updating, return the worst write time
+
+    Returns:
+        tuple: (operation seconds, max write seconds, writes done)
+    """
+    done = threading.Event()
+    latencies = []
+
+    def writer():
+        connection, cursor = get_database_connection(db_path)
+        while not done.is_set():
+            start = time.perf_counter()
+            cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = 1")
+            connection.commit()
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.2)
+        connection.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    start = time.perf_counter()
+    try:
+        operation()
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        thread.join()
+    return elapsed, max(latencies, default=0.0), len(latencies)
+
+
+def benchmark_backup(db_path, rows):
+    """Time snapshots, verification and restore of the database"""
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+    print(f"\n=== Backup ({rows} rows, {size_mb:.1f} MB) ===")
+
+    directory = os.path.dirname(db_path)
+    plain_path = os.path.join(directory, "backup.db")
+    compressed_path = os.path.join(directory, "backup.db.gz")
+
+    for label, options in (
+        ("Single step     ", {"pages": -1, "pause": 0}),
+        ("Paged, throttled", {}),
+    ):
+        elapsed, max_write, writes = measure_writer_latency(
+            db_path, lambda: create_backup(plain_path, db_path, **options)
+        )
+        print(
+            f"{label}: {elapsed:.3f}s ({size_mb / elapsed:.0f} MB/s), "
+            f"{writes} concurrent writes, slowest {max_write * 1000:.1f}ms"
+        )
+
+    compress_time = timed(
+        create_backup, compressed_path, db_path, compress=True, repeat=1
+    )
+    compressed_mb = os.path.getsize(compressed_path) / 1024 / 1024
+    print(f"Compressed      : {compress_time:.3f}s ({compressed_mb:.1f} MB)")
+
+    for label, path in (
+        ("Verify plain    ", plain_path),
+        ("Verify gzip     ", compressed_path),
+    ):
+        print(f"{label}: {timed(verify_backup, path, repeat=1):.3f}s")
+
+    restore_path = os.path.join(directory, "restored.db")
+    restore_time = timed(restore_backup, compressed_path, restore_path, repeat=1)
+    print(f"Restore gzip    : {restore_time:.3f}s")
+
+
+def print_rows(products):
+    """Per-row print, as the dashboard rendered tables before"""
+    for product in products:
+        product_id, name, description, stock, price, category = product
+        print(
+            f"{product_id:<5} {name:<20} {description:<20} {price:<15} {stock:<10} {category:<15}"
+        )
+
+
+@contextlib.contextmanager
+def terminal_output():
+    """Line buffered stream on a pseudo-terminal drained by a thread
+
+    Stands in for a terminal emulator, falls back to a line buffered
+    os.devnull where pseudo-terminals are not available.
+    """
+    try:
+        import pty
+    except ImportError:
+        with open(os.devnull, "w", buffering=1) as devnull:
+            yield devnull
+        return
+
+    master, slave = pty.openpty()
+
+    def drain():
+        try:
+            while os.read(master, 65536):
+                pass
+        except OSError:
+            pass
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        with open(slave, "w", buffering=1, encoding="utf-8") as terminal:
+            yield terminal
+    finally:
+        os.close(master)
+
+
+def benchmark_rendering(db_path, rows):
+    """Compare per-row print with the buffered table renderer"""
+    print(f"\n=== Table rendering ({rows} rows) ===")
+
+    products = list(iter_all_products(db_path=db_path))
+
+    with terminal_output() as terminal:
+        with contextlib.redirect_stdout(terminal):
+            print_time = timed(print_rows, products)
+        render_time = timed(render_table, products, PRODUCT_TABLE_COLUMNS, terminal)
+        streamed_time = timed(
+            lambda: render_table(
+                iter_all_products(db_path=db_path), PRODUCT_TABLE_COLUMNS, terminal
+            )
+        )
+
+    print(f"Per-row print        : {rows / print_time:,.0f} rows/s")
+    print(
+        f"Buffered renderer    : {rows / render_time:,.0f} rows/s "
+        f"({print_time / render_time:.1f}x)"
+    )
+    print(f"Streamed from the db : {rows / streamed_time:,.0f} rows/s")
+
+
+BENCHMARKS = {
+    "analytics": benchmark_analytics,
+    "updates": benchmark_updates,
+    "categories": benchmark_categories,
+    "backup": benchmark_backup,
+    "rendering": benchmark_rendering,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory benchmarks")
+    parser.add_argument(
+        "benchmark", nargs="?", choices=[*BENCHMARKS, "all"], default="all"
+    )
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    selected = BENCHMARKS if args.benchmark == "all" else [args.benchmark]
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "benchmark.db")
+        create_benchmark_database(db_path, args.rows)
+        for name in selected:
+            BENCHMARKS[name](db_path, args.rows)
+
+
+if __name__ == "__main__":
+    main()
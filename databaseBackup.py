@@ -0,0 +1,314 @@
+"""
+Database Backup - Snapshots of inventory.db that are safe while the app writes
+Usage:
+    python databaseBackup.py backup [--compress] [--output PATH]
+    python databaseBackup.py verify PATH
+    python databaseBackup.py restore PATH
+"""
+
+import argparse
+import contextlib
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from appFeatures import DATABASE_PATH
+
+BACKUP_DIRECTORY = "backups"
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_PAUSE = 0.005
+BACKUP_MAX_RESTARTS = 3
+BACKUP_COMPRESS_LEVEL = 6
+COMPRESSED_SUFFIX = ".gz"
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Errors raised while reading or decompressing a damaged backup file
+BACKUP_READ_ERRORS = (OSError, EOFError, zlib.error)
+
+
+def default_backup_path(compress=False):
+    """Build a timestamped path inside the backups directory"""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    suffix = COMPRESSED_SUFFIX if compress else ""
+    return os.path.join(BACKUP_DIRECTORY, f"inventory-{timestamp}.db{suffix}")
+
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback to stop a copy that keeps restarting"""
+
+
+def copy_database(
+    source_path,
+    destination_path,
+    pages=BACKUP_PAGES_PER_STEP,
+    pause=BACKUP_STEP_PAUSE,
+    max_restarts=BACKUP_MAX_RESTARTS,
+):
+    """Copy a database with the online backup API, a few pages per step
+
+    The source is only locked while each step runs, the pause between steps
+    lets live writers get in. A write from another connection makes SQLite
+    restart the copy, so the result is always a consistent snapshot. With a
+    busy writer that could go on forever, so after max_restarts the rest is
+    copied in a single step, holding the read lock only for that copy.
+
+    Returns:
+        int: number of times the paged copy restarted
+    """
+    restarts = 0
+    previous_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, previous_remaining
+        if previous_remaining is not None and remaining >= previous_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise BackupRestarted()
+        previous_remaining = remaining
+
+        if remaining and pause:
+            time.sleep(pause)
+
+    source = sqlite3.connect(source_path)
+    destination = sqlite3.connect(destination_path)
+    try:
+        try:
+            source.backup(destination, pages=pages, progress=progress)
+        except BackupRestarted:
+            source.backup(destination)
+    finally:
+        destination.close()
+        source.close()
+    return restarts
+
+
+def create_backup(
+    destination_path=None,
+    db_path=DATABASE_PATH,
+    compress=False,
+    pages=BACKUP_PAGES_PER_STEP,
+    pause=BACKUP_STEP_PAUSE,
+):
+    """Create a snapshot of the database, optionally gzip compressed
+
+    The snapshot is written to a temporary file next to the destination and
+    renamed at the end, so a failed backup never leaves a partial file.
+
+    Returns:
+        str: path of the backup file
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+
+    if destination_path is None:
+        destination_path = default_backup_path(compress)
+
+    directory = os.path.dirname(os.path.abspath(destination_path))
+    os.makedirs(directory, exist_ok=True)
+
+    snapshot_fd, snapshot_path = tempfile.mkstemp(suffix=".db", dir=directory)
+    os.close(snapshot_fd)
+    try:
+        copy_database(db_path, snapshot_path, pages, pause)
+
+        if compress:
+            compressed_path = f"{snapshot_path}{COMPRESSED_SUFFIX}"
+            with open(snapshot_path, "rb") as snapshot, gzip.open(
+                compressed_path, "wb", compresslevel=BACKUP_COMPRESS_LEVEL
+            ) as compressed:
+                shutil.copyfileobj(snapshot, compressed)
+            os.remove(snapshot_path)
+            snapshot_path = compressed_path
+
+        os.replace(snapshot_path, destination_path)
+    except BaseException:
+        for path in (snapshot_path, f"{snapshot_path}{COMPRESSED_SUFFIX}"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    return destination_path
+
+
+def is_compressed_backup(backup_path):
+    """Check for the gzip magic bytes, the file name may not end in .gz"""
+    with open(backup_path, "rb") as backup:
+        return backup.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+@contextlib.contextmanager
+def open_backup_file(backup_path):
+    """Yield a plain database path for a backup, decompressing if needed"""
+    if not is_compressed_backup(backup_path):
+        yield backup_path
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "backup.db")
+        with gzip.open(backup_path, "rb") as compressed, open(
+            database_path, "wb"
+        ) as database:
+            shutil.copyfileobj(compressed, database)
+        yield database_path
+
+
+def check_inventory_schema(connection):
+    """Check that a database looks like an inventory database
+
+    integrity_check accepts an empty file or any unrelated SQLite database,
+    restoring one of those would wipe the live inventory.
+
+    Returns:
+        list: problems found, empty when the schema looks right
+    """
+    page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+    if not page_count:
+        return ["Database is empty"]
+
+    tables = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+    required_tables = ["products"]
+    user_version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if user_version >= 1:
+        required_tables.append("categories")
+
+    return [
+        f"Missing table: {table}" for table in required_tables if table not in tables
+    ]
+
+
+def check_database_integrity(database_path):
+    """Run PRAGMA integrity_check and the inventory schema check on a file
+
+    Returns:
+        tuple: (is_valid, list of messages reported by SQLite)
+    """
+    if not os.path.isfile(database_path):
+        return False, [f"Database file not found: {database_path}"]
+
+    # as_uri() escapes characters like ? and # that would end the path
+    database_uri = Path(database_path).resolve().as_uri() + "?mode=ro"
+    try:
+        connection = sqlite3.connect(database_uri, uri=True)
+        try:
+            rows = connection.execute("PRAGMA integrity_check").fetchall()
+            problems = check_inventory_schema(connection)
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as error:
+        return False, [str(error)]
+
+    messages = [row[0] for row in rows]
+    if messages != ["ok"]:
+        return False, messages
+    if problems:
+        return False, problems
+    return True, messages
+
+
+def verify_backup(backup_path):
+    """Check that a backup file (plain or compressed) is a sound database
+
+    Returns:
+        tuple: (is_valid, list of messages reported by SQLite)
+    """
+    if not os.path.exists(backup_path):
+        return False, [f"Backup file not found: {backup_path}"]
+
+    try:
+        with open_backup_file(backup_path) as database_path:
+            return check_database_integrity(database_path)
+    except BACKUP_READ_ERRORS as error:
+        return False, [str(error)]
+
+
+def restore_backup(
+    backup_path,
+    db_path=DATABASE_PATH,
+    pages=BACKUP_PAGES_PER_STEP,
+    pause=BACKUP_STEP_PAUSE,
+):
+    """Replace the database contents with a verified backup
+
+    The backup is opened once, the checks and the copy use the same
+    decompressed file. The restore also goes through the backup API, so
+    connections that have the database open see either the old or the
+    restored contents.
+
+    Returns:
+        tuple: (success, list of messages)
+    """
+    if not os.path.exists(backup_path):
+        return False, [f"Backup file not found: {backup_path}"]
+
+    try:
+        with open_backup_file(backup_path) as database_path:
+            is_valid, messages = check_database_integrity(database_path)
+            if not is_valid:
+                return False, messages
+            copy_database(database_path, db_path, pages, pause)
+    except BACKUP_READ_ERRORS as error:
+        return False, [str(error)]
+    return True, messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory database backups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = subparsers.add_parser("backup", help="Create a snapshot")
+    backup_parser.add_argument("--output", help="Backup file path")
+    backup_parser.add_argument("--compress", action="store_true")
+
+    verify_parser = subparsers.add_parser("verify", help="Check a backup")
+    verify_parser.add_argument("path")
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a backup")
+    restore_parser.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "backup":
+        start = time.perf_counter()
+        backup_path = create_backup(args.output, compress=args.compress)
+        elapsed = time.perf_counter() - start
+        print(f"✅ Backup created: {backup_path} ({elapsed:.2f}s)")
+
+    elif args.command == "verify":
+        is_valid, messages = verify_backup(args.path)
+        if is_valid:
+            print(f"✅ Backup {args.path} is valid.")
+        else:
+            print(f"❌ Backup {args.path} is not valid:")
+            for message in messages:
+                print(f"  {message}")
+
+    elif args.command == "restore":
+        confirm = input(
+            f"This will replace {DATABASE_PATH} with {args.path}. Continue? (y/N): "
+        ).lower()
+        if confirm != "y":
+            print("❌ Restore cancelled.")
+            return
+
+        success, messages = restore_backup(args.path)
+        if success:
+            print(f"✅ Database restored from {args.path}")
+        else:
+            print("❌ Restore failed, the backup is not valid:")
+            for message in messages:
+                print(f"  {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,24 @@ from appFeatures import (
     get_complete_report,
     get_products_by_numeric_filter,
     get_valid_input,
+    iter_all_products,
     search_product_by_id,
     search_products_by_category,
     search_products_by_name,
     update_product,
 )
+from reportAnalytics import get_extended_report
+from tableRenderer import default_page_size, render_table
+
+# Product table columns: (header, index in the product row, min width, max width)
+PRODUCT_TABLE_COLUMNS = [
+    ("ID", 0, 6, 10),
+    ("Name", 1, 10, 20),
+    ("Description", 2, 15, 30),
+    ("Price", 4, 12, 15),
+    ("Stock", 3, 6, 10),
+    ("Category", 5, 8, 10),
+]
 
 
 class MarketDashboard:
@@ -47,22 +60,14 @@ class MarketDashboard:
         """Display all products from database"""
         print("\n=== ALL PRODUCTS ===")
 
-        products = get_all_products()
+        total_products = render_table(
+            iter_all_products(), PRODUCT_TABLE_COLUMNS, page_size=default_page_size()
+        )
 
-        if not products:
+        if not total_products:
             print("No products found in the database.")
         else:
-            print(
-                f"{'ID':<5} {'Name':<20} {'Price':<15} {'Stock':<10} {'Category':<15}"
-            )
-            print("-" * 70)
-            for product in products:
-                product_id, name, description, stock, price, category = product
-                print(
-                    f"{product_id:<5} {name:<20} {description:<20} {price:<15} {stock:<10} {category:<15}"
-                )
-
-            print(f"\nTotal products: {len(products)}")
+            print(f"\nTotal products shown: {total_products}")
 
         input("\nPress Enter to continue...")
 
@@ -84,7 +89,7 @@ class MarketDashboard:
             name = input("Enter product name (partial match): ").strip()
             products = search_products_by_name(name)
         elif option == "3":
-            category = input("Enter category: ").strip()
+            category = input("Enter category (starts with): ").strip()
             products = search_products_by_category(category)
         else:
             print("Invalid option.")
@@ -93,15 +98,7 @@ class MarketDashboard:
 
         if products:
             print(f"\n✅ Found {len(products)} product(s):")
-            print(
-                f"{'ID':<5} {'Name':<20} {'Price':<15} {'Stock':<10} {'Category':<15}"
-            )
-            print("-" * 70)
-            for product in products:
-                product_id, name, description, stock, price, category = product
-                print(
-                    f"{product_id:<5} {name:<20} {description:<20} {price:<15} {stock:<10} {category:<15}"
-                )
+            render_table(products, PRODUCT_TABLE_COLUMNS, page_size=default_page_size())
         else:
             print("❌ No products found.")
 
@@ -162,6 +159,15 @@ class MarketDashboard:
             for category, count in report_data["categories"]:
                 print(f"  {category}: {count} products")
 
+        # Ask for extended analytics report
+        print("\n" + "=" * 50)
+        analytics_option = (
+            input("Do you want an extended analytics report? (y/N): ").strip().lower()
+        )
+
+        if analytics_option == "y":
+            self.show_extended_report()
+
         # Ask for detailed filter report
         print("\n" + "=" * 50)
         filter_option = (
@@ -173,6 +179,37 @@ class MarketDashboard:
 
         input("\nPress Enter to continue...")
 
+    def show_extended_report(self):
+        """Show price/stock distributions and value per category"""
+        print("\n=== EXTENDED ANALYTICS REPORT ===")
+
+        report_data = get_extended_report()
+
+        if not report_data["total_products"]:
+            print("No products found in the database.")
+            return
+
+        print(f"Products analyzed: {report_data['total_products']}")
+        print(
+            f"Stock-weighted Average Price: ${report_data['weighted_average_price']:.2f}"
+        )
+
+        print("\nPrice Percentiles:")
+        for percent, price in report_data["price_percentiles"].items():
+            print(f"  P{percent}: ${price:.2f}")
+
+        print("\nStock Percentiles:")
+        for percent, stock in report_data["stock_percentiles"].items():
+            print(f"  P{percent}: {stock:.1f}")
+
+        print("\nPrice Distribution:")
+        for low, high, count in report_data["price_histogram"]:
+            print(f"  ${low:>10.2f} - ${high:>10.2f}: {count} products")
+
+        print("\nInventory Value by Category:")
+        for category, value in report_data["category_values"]:
+            print(f"  {category}: ${value:.2f}")
+
     def show_filter_report(self):
         """Show detailed filter report by numeric fields"""
         print("\n=== DETAILED FILTER REPORT ===")
@@ -236,15 +273,9 @@ class MarketDashboard:
 
             # Display filtered products
             if products:
-                print(
-                    f"{'ID':<5} {'Name':<20} {'Description':<20} {'Price':<15} {'Stock':<10} {'Category':<15}"
+                render_table(
+                    products, PRODUCT_TABLE_COLUMNS, page_size=default_page_size()
                 )
-                print("-" * 90)
-                for product in products:
-                    product_id, name, description, stock, price, category = product
-                    print(
-                        f"{product_id:<5} {name:<20} {description:<20} {price:<15} {stock:<10} {category:<15}"
-                    )
                 print(f"\nTotal found: {len(products)} products")
             else:
                 print("❌ No products found matching the filter.")
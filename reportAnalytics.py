@@ -0,0 +1,243 @@
+"""
+Report Analytics - Price and stock distributions for large inventories
+Columns are pulled in bulk and aggregated with NumPy when it is installed,
+falling back to pure Python otherwise
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from appFeatures import DATABASE_PATH, get_database_connection
+
+FETCH_BATCH_SIZE = 10000
+PERCENTILES = (25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+# Products without a category get MISSING_CATEGORY_ID so ids fit an int64 array
+MISSING_CATEGORY_ID = -1
+
+REPORT_COLUMNS_QUERY = f"""
+    SELECT CAST(REPLACE(REPLACE(price, '$', ''), ' ', '') AS REAL),
+           CAST(stock AS INTEGER),
+           COALESCE(category_id, {MISSING_CATEGORY_ID})
+    FROM products
+"""
+
+
+def numpy_available():
+    """Check if NumPy can be used for the analytics"""
+    return np is not None
+
+
+def fetch_report_columns(cursor, use_numpy, batch_size=FETCH_BATCH_SIZE):
+    """Fetch price, stock and category columns in batches
+
+    The row count is read first inside the same transaction so the NumPy
+    arrays can be preallocated and filled batch by batch without copies.
+    Category ids go straight into their array and are turned into dense
+    codes at the end with np.unique(), the pure Python path maps them with
+    a dict as rows arrive.
+
+    Returns:
+        tuple: (prices, stocks, category_codes, categories) where the first
+        three are NumPy arrays or lists and categories[code] is the name
+    """
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("SELECT COUNT(*) FROM products")
+        total_rows = cursor.fetchone()[0]
+
+        if use_numpy:
+            prices = np.empty(total_rows, dtype=np.float64)
+            stocks = np.empty(total_rows, dtype=np.int64)
+            category_ids = np.empty(total_rows, dtype=np.int64)
+        else:
+            prices, stocks, category_codes = [], [], []
+            codes_by_category = {}
+
+        cursor.execute(REPORT_COLUMNS_QUERY)
+        start = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+
+            batch_prices, batch_stocks, batch_category_ids = zip(*batch)
+
+            if use_numpy:
+                end = start + len(batch)
+                prices[start:end] = batch_prices
+                stocks[start:end] = batch_stocks
+                category_ids[start:end] = batch_category_ids
+                start = end
+            else:
+                prices.extend(batch_prices)
+                stocks.extend(batch_stocks)
+                category_codes.extend(
+                    codes_by_category.setdefault(category_id, len(codes_by_category))
+                    for category_id in batch_category_ids
+                )
+
+        cursor.execute("SELECT id, name FROM categories")
+        category_names = dict(cursor.fetchall())
+    finally:
+        cursor.execute("COMMIT")
+
+    if use_numpy:
+        if start < total_rows:
+            prices = prices[:start]
+            stocks = stocks[:start]
+            category_ids = category_ids[:start]
+        unique_ids, category_codes = np.unique(category_ids, return_inverse=True)
+        used_ids = unique_ids.tolist()
+    else:
+        used_ids = list(codes_by_category)
+
+    categories = [category_names.get(category_id) for category_id in used_ids]
+    return prices, stocks, category_codes, categories
+
+
+def empty_extended_report():
+    """Report returned when there are no products"""
+    return {
+        "total_products": 0,
+        "price_percentiles": {},
+        "stock_percentiles": {},
+        "price_histogram": [],
+        "category_values": [],
+        "weighted_average_price": 0.0,
+    }
+
+
+def compute_report_numpy(prices, stocks, category_codes, categories):
+    """Compute the extended report with vectorized NumPy operations"""
+    if len(prices) == 0:
+        return empty_extended_report()
+
+    values = prices * stocks
+    total_stock = stocks.sum()
+
+    price_percentiles = np.percentile(prices, PERCENTILES)
+    stock_percentiles = np.percentile(stocks, PERCENTILES)
+
+    counts, edges = np.histogram(prices, bins=HISTOGRAM_BINS)
+    price_histogram = [
+        (float(edges[i]), float(edges[i + 1]), int(counts[i]))
+        for i in range(HISTOGRAM_BINS)
+    ]
+
+    category_totals = np.bincount(
+        category_codes, weights=values, minlength=len(categories)
+    )
+    category_values = sorted(
+        zip(categories, (float(total) for total in category_totals)),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    weighted_average_price = (
+        float(values.sum() / total_stock) if total_stock else 0.0
+    )
+
+    return {
+        "total_products": int(len(prices)),
+        "price_percentiles": dict(zip(PERCENTILES, map(float, price_percentiles))),
+        "stock_percentiles": dict(zip(PERCENTILES, map(float, stock_percentiles))),
+        "price_histogram": price_histogram,
+        "category_values": category_values,
+        "weighted_average_price": weighted_average_price,
+    }
+
+
+def percentile(sorted_values, percent):
+    """Linear interpolation percentile, same method as NumPy's default"""
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def histogram(values, bins):
+    """Equal width histogram, last bin includes the maximum like NumPy"""
+    low, high = min(values), max(values)
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+
+    counts = [0] * bins
+    for value in values:
+        index = int((value - low) / width)
+        counts[min(index, bins - 1)] += 1
+
+    return [(low + i * width, low + (i + 1) * width, counts[i]) for i in range(bins)]
+
+
+def compute_report_python(prices, stocks, category_codes, categories):
+    """Compute the extended report in pure Python"""
+    if not prices:
+        return empty_extended_report()
+
+    sorted_prices = sorted(prices)
+    sorted_stocks = sorted(stocks)
+
+    category_totals = [0.0] * len(categories)
+    total_value = 0.0
+    for price, stock, code in zip(prices, stocks, category_codes):
+        value = price * stock
+        category_totals[code] += value
+        total_value += value
+    total_stock = sum(stocks)
+
+    category_values = sorted(
+        zip(categories, category_totals), key=lambda item: item[1], reverse=True
+    )
+
+    return {
+        "total_products": len(prices),
+        "price_percentiles": {
+            p: float(percentile(sorted_prices, p)) for p in PERCENTILES
+        },
+        "stock_percentiles": {
+            p: float(percentile(sorted_stocks, p)) for p in PERCENTILES
+        },
+        "price_histogram": histogram(prices, HISTOGRAM_BINS),
+        "category_values": category_values,
+        "weighted_average_price": total_value / total_stock if total_stock else 0.0,
+    }
+
+
+def get_extended_report(db_path=DATABASE_PATH, use_numpy=None):
+    """Get price/stock distributions for the whole inventory
+
+    Args:
+        db_path: database file to read
+        use_numpy: force the NumPy (True) or pure Python (False) path,
+            None picks NumPy when it is installed
+
+    Returns:
+        dict: {
+            'total_products': int,
+            'price_percentiles': dict percentile -> price,
+            'stock_percentiles': dict percentile -> stock,
+            'price_histogram': list of tuples (low, high, count),
+            'category_values': list of tuples (category, value) by value desc,
+            'weighted_average_price': float
+        }
+    """
+    if use_numpy is None:
+        use_numpy = numpy_available()
+    elif use_numpy and not numpy_available():
+        raise RuntimeError("NumPy is not installed")
+
+    connection, cursor = get_database_connection(db_path)
+    try:
+        columns = fetch_report_columns(cursor, use_numpy)
+    finally:
+        connection.close()
+
+    if use_numpy:
+        return compute_report_numpy(*columns)
+    return compute_report_python(*columns)
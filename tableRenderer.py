@@ -0,0 +1,170 @@
+"""
+Table Renderer - Buffered terminal tables for large result sets
+Rows are consumed from any iterator, only a sample and one chunk of output
+are kept in memory at a time
+"""
+
+import itertools
+import operator
+import shutil
+import sys
+
+WIDTH_SAMPLE_ROWS = 200
+CHUNK_ROWS = 1000
+TRUNCATION_MARK = "…"
+COLUMN_SEPARATOR = " "
+END_OF_ROWS = object()
+
+
+def default_page_size(output=None):
+    """Rows per page for the pager, None when the output is not a terminal"""
+    if output is None:
+        output = sys.stdout
+    if not output.isatty():
+        return None
+    # Leave room for the header and the pager prompt
+    return max(shutil.get_terminal_size().lines - 4, 5)
+
+
+def truncate(text, width):
+    """Cut text to width, marking the cut with TRUNCATION_MARK"""
+    if len(text) <= width:
+        return text
+    return text[: width - len(TRUNCATION_MARK)] + TRUNCATION_MARK
+
+
+def cell_text(value):
+    """Text shown for a value, missing values (None) are left empty"""
+    return "" if value is None else str(value)
+
+
+def compute_column_widths(columns, sample_rows):
+    """Width of each column from the header and a sample of rows
+
+    Args:
+        columns: list of tuples (header, row index, min width, max width)
+        sample_rows: rows used to measure the values
+
+    Returns:
+        list of int widths, each between its column min and max width
+    """
+    widths = []
+    for header, index, min_width, max_width in columns:
+        longest = max((len(cell_text(row[index])) for row in sample_rows), default=0)
+        widths.append(min(max(len(header), longest, min_width), max_width))
+    return widths
+
+
+def build_row_formatter(columns, widths):
+    """Build a function turning a row into a table line
+
+    Most rows are formatted with a single str.format() call. Each cell is
+    allowed one character over its width, so a line longer than expected
+    means some value has to be cut, and only those rows are truncated value
+    by value.
+    """
+    indexes = [column[1] for column in columns]
+    check_template = COLUMN_SEPARATOR.join(
+        f"{{!s:<{width}.{width + 1}}}" for width in widths
+    )
+    template = COLUMN_SEPARATOR.join(f"{{!s:<{width}}}" for width in widths)
+    line_length = sum(widths) + len(COLUMN_SEPARATOR) * (len(widths) - 1)
+    mark = TRUNCATION_MARK
+    mark_length = len(mark)
+
+    if len(indexes) > 1:
+        get_values = operator.itemgetter(*indexes)
+    else:
+        get_single_value = operator.itemgetter(*indexes)
+
+        def get_values(row):
+            """itemgetter returns a bare value for a single index, wrap it"""
+            return (get_single_value(row),)
+
+    def format_row(row):
+        values = get_values(row)
+        if None in values:
+            values = [cell_text(value) for value in values]
+        line = check_template.format(*values)
+        if len(line) > line_length:
+            line = template.format(
+                *[
+                    text if len(text) <= width else text[: width - mark_length] + mark
+                    for text, width in zip(map(str, values), widths)
+                ]
+            )
+        return line.rstrip()
+
+    return format_row
+
+
+def render_table(
+    rows,
+    columns,
+    output=None,
+    page_size=None,
+    sample_size=WIDTH_SAMPLE_ROWS,
+    chunk_rows=CHUNK_ROWS,
+):
+    """Render rows as a table, writing the output in chunks
+
+    Args:
+        rows: iterable of row tuples, consumed only once
+        columns: list of tuples (header, row index, min width, max width)
+        output: stream with a write() method, sys.stdout by default
+        page_size: rows per page, asking to continue between pages,
+            None writes everything without pausing
+        sample_size: rows read ahead to compute the column widths
+        chunk_rows: rows formatted before each write
+
+    Returns:
+        int: number of rows rendered, 0 if there were none
+    """
+    if output is None:
+        output = sys.stdout
+
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, sample_size))
+    if not sample:
+        return 0
+
+    widths = compute_column_widths(columns, sample)
+    header = COLUMN_SEPARATOR.join(
+        truncate(column[0], width).ljust(width)
+        for column, width in zip(columns, widths)
+    ).rstrip()
+    separator = "-" * len(header)
+    format_row = build_row_formatter(columns, widths)
+
+    if page_size:
+        chunk_rows = min(chunk_rows, page_size)
+
+    output.write(f"{header}\n{separator}\n")
+
+    rendered = 0
+    chunk = []
+    rows = itertools.chain(sample, rows)
+    row = next(rows, END_OF_ROWS)
+    while row is not END_OF_ROWS:
+        chunk.append(format_row(row))
+        rendered += 1
+
+        if len(chunk) >= chunk_rows:
+            output.write("\n".join(chunk) + "\n")
+            chunk.clear()
+
+        # Read one row ahead so the last page does not ask to continue
+        row = next(rows, END_OF_ROWS)
+        if page_size and rendered % page_size == 0 and row is not END_OF_ROWS:
+            if chunk:
+                output.write("\n".join(chunk) + "\n")
+                chunk.clear()
+            output.flush()
+            answer = input("-- More -- (Enter to continue, q to stop): ")
+            if answer.strip().lower() == "q":
+                return rendered
+
+    if chunk:
+        output.write("\n".join(chunk) + "\n")
+    output.flush()
+    return rendered